@@ -1,42 +1,245 @@
 from fastmcp import FastMCP
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import os
+import stat
 import subprocess
+import shlex
+import tempfile
+import uuid
+import re
 import shutil
+import select
 import platform
 import socket
 import requests
+from requests.adapters import HTTPAdapter
+from http.cookiejar import DefaultCookiePolicy
 import zipfile
+import fnmatch
 import glob
 import asyncio
+import threading
+import atexit
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
 from playwright.async_api import async_playwright
 import math
+import operator
 import datetime
 import time
 import difflib
+import hashlib
+from functools import lru_cache
+
+try:
+    import ptyprocess
+except ImportError:  # execute_shell_command falls back to one subprocess per call
+    ptyprocess = None
 
 # Environment-based configuration
-HOST = "0.0.0.0"  # Always bind to all interfaces for container deployment
+HOST = os.getenv("MCP_HOST", "0.0.0.0")  # All interfaces for container deployment; a path binds a Unix socket
 PORT = int(os.getenv("PORT", 8080))  # Use environment variable with fallback
 PATH = "/mcp"  # Fixed MCP path
 WORKSPACE_DIR = os.getenv("MCP_WORKSPACE", "/app/workspace")
 BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "true").lower() == "true"
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+BROWSER_POOL_MAX = int(os.getenv("BROWSER_POOL_MAX", 3))
+BROWSER_POOL_MIN = int(os.getenv("BROWSER_POOL_MIN", 0))
+BROWSER_POOL_IDLE_TIMEOUT = float(os.getenv("BROWSER_POOL_IDLE_TIMEOUT", 300))
+BROWSER_PAGE_TTL = float(os.getenv("BROWSER_PAGE_TTL", 30))
+
+# Host facts that cannot change while the server runs
+_SYSTEM = platform.system().lower()
+_IS_WINDOWS = _SYSTEM == "windows"
+_PING_PARAM = "-n" if _IS_WINDOWS else "-c"
 
 mcp = FastMCP("Local MCP Server")
 
+# Persistent event loop for the Playwright tools, run in a daemon thread so the
+# browser singleton below stays bound to a single loop across tool calls
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, name="browser-loop", daemon=True).start()
+
+def _run(coro):
+    """Run a coroutine on the persistent browser loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
 # Singleton for Playwright browser
 _playwright = None
 _browser = None
+_browser_lock = asyncio.Lock()
 
 async def get_browser():
     global _playwright, _browser
-    if _playwright is None:
-        _playwright = await async_playwright().start()
-    if _browser is None:
-        _browser = await _playwright.chromium.launch(headless=BROWSER_HEADLESS)
+    async with _browser_lock:  # concurrent first calls must not each launch a browser
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+        if _browser is None or not _browser.is_connected():  # relaunch after a Chromium crash
+            _browser = await _playwright.chromium.launch(headless=BROWSER_HEADLESS)
     return _browser
 
+class BrowserContextPool:
+    """
+    Bounded pool of reusable Playwright browser contexts on the shared browser.
+
+    At most max_size contexts exist at once. Released contexts go back to an idle
+    stack so later tool calls skip context bootstrap and keep warm caches; idle
+    contexts older than idle_timeout, or whose browser disconnected, are closed by a
+    periodic health check, which keeps min_size healthy ones around for warm(). All
+    methods must run on _LOOP.
+    """
+
+    def __init__(self, max_size: int, idle_timeout: float, min_size: int = 0):
+        self.max_size = max(1, max_size)
+        self.min_size = min(max(0, min_size), self.max_size)
+        self.idle_timeout = idle_timeout
+        self._slots = asyncio.Semaphore(self.max_size)
+        self._idle = deque()  # (context, released_at) pairs, most recent last
+        self._health_task = None
+
+    @staticmethod
+    def _healthy(ctx) -> bool:
+        return ctx.browser is not None and ctx.browser.is_connected()
+
+    @staticmethod
+    async def _close(ctx) -> None:
+        try:
+            await ctx.close()
+        except Exception:
+            pass
+
+    def _start_health_check(self) -> None:
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_check())
+
+    async def acquire(self):
+        self._start_health_check()
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                ctx, _ = self._idle.pop()
+                if self._healthy(ctx):
+                    return ctx
+                await self._close(ctx)
+            browser = await get_browser()
+            return await browser.new_context()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def warm(self) -> None:
+        """
+        Launch the browser and pre-create contexts until min_size of them sit idle.
+        Meant for startup, before any tool call holds a context.
+        """
+        self._start_health_check()
+        browser = await get_browser()
+        while len(self._idle) < self.min_size:
+            async with self._slots:
+                ctx = await browser.new_context()
+            self._idle.append((ctx, time.monotonic()))
+
+    async def release(self, ctx) -> None:
+        try:
+            if self._healthy(ctx):
+                self._idle.append((ctx, time.monotonic()))
+            else:
+                await self._close(ctx)
+        finally:
+            self._slots.release()
+
+    async def _health_check(self) -> None:
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1))
+            now = time.monotonic()
+            keep = sum(1 for ctx, _ in self._idle if self._healthy(ctx))
+            expired = []
+            for item in self._idle:  # oldest first, so the freshest min_size survive
+                if not self._healthy(item[0]):
+                    expired.append(item)
+                elif now - item[1] >= self.idle_timeout and keep > self.min_size:
+                    expired.append(item)
+                    keep -= 1
+            for item in expired:
+                self._idle.remove(item)
+            for ctx, _ in expired:
+                await self._close(ctx)
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        while self._idle:
+            ctx, _ = self._idle.pop()
+            await self._close(ctx)
+
+_pool = BrowserContextPool(BROWSER_POOL_MAX, BROWSER_POOL_IDLE_TIMEOUT, BROWSER_POOL_MIN)
+
+# Resource types skipped by tools that only read DOM text or the accessibility tree
+_HEAVY_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+async def _abort_heavy_resources(route) -> None:
+    if route.request.resource_type in _HEAVY_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+@asynccontextmanager
+async def _pooled_page(block_resources: bool = False):
+    """
+    Open a page on a pooled browser context, returning the context to the pool on exit.
+    With block_resources, image/font/media requests are aborted; the route is installed on
+    the page rather than the shared context so other tools still load pages in full.
+    """
+    ctx = await _pool.acquire()
+    try:
+        page = await ctx.new_page()
+        try:
+            if block_resources:
+                await page.route("**/*", _abort_heavy_resources)
+            yield page
+        finally:
+            await page.close()
+    finally:
+        await _pool.release(ctx)
+
+async def _close_browser():
+    global _playwright, _browser
+    await _pool.close()
+    if _browser is not None:
+        await _browser.close()
+        _browser = None
+    if _playwright is not None:
+        await _playwright.stop()
+        _playwright = None
+
+@atexit.register
+def _shutdown_browser():
+    """Drain the context pool and stop Playwright when the server exits."""
+    if _playwright is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_close_browser(), _LOOP).result(timeout=10)
+    except Exception:
+        pass
+
+@lru_cache(maxsize=32)
+def _resolved_root(base_dir: str) -> str:
+    return os.path.realpath(base_dir)
+
+def _safe_join(base_dir: str, path: str) -> str:
+    """
+    Join path onto base_dir, raising ValueError if the result resolves outside base_dir.
+    The resolved base_dir is memoized; the returned path itself is left unresolved so
+    tools act on symlinks inside base_dir rather than on their targets.
+    """
+    root = _resolved_root(base_dir)
+    full = os.path.join(root, path)
+    resolved = os.path.realpath(full)
+    if resolved != root and not resolved.startswith(os.path.join(root, "")):
+        raise ValueError(f"Path '{path}' escapes base_dir '{base_dir}'.")
+    return full
+
 @mcp.tool()
 def list_dir(base_dir: str, path: str = ".") -> List[str]:
     """
@@ -51,8 +254,9 @@ def list_dir(base_dir: str, path: str = ".") -> List[str]:
     
     Use case: To enumerate the contents of a project or subfolder, e.g., to find available files to read or edit.
     """
-    abs_path = os.path.join(base_dir, path)
-    return os.listdir(abs_path)
+    abs_path = _safe_join(base_dir, path)
+    with os.scandir(abs_path) as it:
+        return [entry.name for entry in it]
 
 @mcp.tool()
 def read_file(base_dir: str, path: str) -> str:
@@ -68,8 +272,8 @@ def read_file(base_dir: str, path: str) -> str:
     
     Use case: To view or process the contents of a file, such as source code, configuration, or documentation.
     """
-    abs_path = os.path.join(base_dir, path)
-    with open(abs_path, "r", encoding="utf-8") as f:
+    abs_path = _safe_join(base_dir, path)
+    with open(abs_path, "r", encoding="utf-8", buffering=1 << 20) as f:
         return f.read()
 
 @mcp.tool()
@@ -87,8 +291,8 @@ def write_file(base_dir: str, path: str, content: str) -> None:
     
     Use case: To create or update files, such as saving code, notes, or configuration changes.
     """
-    abs_path = os.path.join(base_dir, path)
-    with open(abs_path, "w", encoding="utf-8") as f:
+    abs_path = _safe_join(base_dir, path)
+    with open(abs_path, "w", encoding="utf-8", buffering=1 << 20) as f:
         f.write(content)
 
 @mcp.tool()
@@ -105,7 +309,7 @@ def delete_file(base_dir: str, path: str) -> None:
     
     Use case: To remove unwanted or obsolete files from a project or workspace.
     """
-    abs_path = os.path.join(base_dir, path)
+    abs_path = _safe_join(base_dir, path)
     os.remove(abs_path)
 
 @mcp.tool()
@@ -122,7 +326,7 @@ def create_folder(base_dir: str, path: str) -> None:
     
     Use case: To organize files by creating new directories for code, data, or other resources.
     """
-    abs_path = os.path.join(base_dir, path)
+    abs_path = _safe_join(base_dir, path)
     os.makedirs(abs_path, exist_ok=True)
 
 @mcp.tool()
@@ -139,40 +343,204 @@ def delete_folder(base_dir: str, path: str) -> None:
     
     Use case: To remove entire directories, such as cleaning up temporary or obsolete project folders.
     """
-    abs_path = os.path.join(base_dir, path)
+    abs_path = _safe_join(base_dir, path)
     shutil.rmtree(abs_path)
 
+# Blacklist of dangerous commands/patterns
+# Blacklist entries that are whole command words are matched per token; the rest
+# (entries with spaces, slashes or shell punctuation) stay as substring patterns.
+_BLACKLIST_TOKENS = frozenset({
+    'shutdown', 'reboot', 'poweroff', 'halt', 'mkfs', 'killall', 'systemctl',
+    'userdel', 'groupdel', 'passwd', 'visudo', 'adduser', 'addgroup', 'deluser',
+    'delgroup', 'pkill',
+})
+_BLACKLIST_SUBSTRINGS = [
+    'rm -rf', 'rm -r /', 'rm -rf /', 'dd ', ':(){:|:&}', '>:(', 'kill 1', 'kill -9 1',
+    'init 0', 'init 6', 'chown /', 'chmod 000 /', 'mv /', 'cp /dev/zero',
+    '>/dev/sda', '>/dev/vda', '>/dev/hda', '>/dev/nvme', '>/dev/xvda', '>/dev/mmcblk',
+    '>/dev/sdb', '>/dev/sdc', '>/dev/sdd', '>/dev/sde', '>/dev/sdf', '>/dev/sdg',
+    '>/dev/sdh', '>/dev/sdi', '>/dev/sdj', '>/dev/sdk', '>/dev/sdl', '>/dev/sdm',
+    '>/dev/sdn', '>/dev/sdo', '>/dev/sdp', '>/dev/sdq', '>/dev/sdr', '>/dev/sds',
+    '>/dev/sdt', '>/dev/sdu', '>/dev/sdv', '>/dev/sdw', '>/dev/sdx', '>/dev/sdy',
+    '>/dev/sdz', 'docker stop', 'docker kill', 'docker rm', 'docker rmi', 'docker system prune',
+    'docker-compose down', 'docker-compose rm', 'docker-compose stop', 'docker-compose kill',
+    'crontab -r', 'su ', 'sudo ', 'init '
+]
+# Letters only, so 'killall5', 'mkfs.ext4' or '/sbin/reboot' still yield a blacklisted word
+_WORD_RE = re.compile(r"[A-Za-z]+")
+_BLACKLIST_RE = re.compile("|".join(re.escape(pattern) for pattern in _BLACKLIST_SUBSTRINGS), re.IGNORECASE)
+
+def _blacklist_hit(command: str) -> Optional[str]:
+    """Return the first blacklisted word or pattern found in command, or None."""
+    for word in _WORD_RE.finditer(command):
+        token = word.group(0).lower()
+        if token in _BLACKLIST_TOKENS:
+            return token
+    match = _BLACKLIST_RE.search(command)
+    return match.group(0).lower() if match else None
+
+class _PersistentShell:
+    """
+    Long-lived bash session on a pty, reused by execute_shell_command for one base_dir.
+
+    Each command is written to a script file and sourced inside a brace group with
+    stdin from /dev/null and stdout/stderr redirected to scratch files, so commands see
+    the same non-tty output as under subprocess (no pagers, columns or colour). Once
+    the group finishes, bash restores its own stdout and prints a unique marker
+    carrying the exit status on the pty; redirections made inside the command can't
+    swallow it. Only that short line ever goes through the terminal, so long or
+    malformed commands cannot wedge the shell.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.closed = False
+        paths = []
+        for suffix in (".sh", ".out", ".err"):
+            fd, path = tempfile.mkstemp(prefix="mcp-shell-", suffix=suffix)
+            os.close(fd)
+            paths.append(path)
+        self.script_path, self.stdout_path, self.stderr_path = paths
+        self.proc = ptyprocess.PtyProcess.spawn(
+            ["bash", "--noprofile", "--norc", "--noediting"],
+            env={**os.environ, "PS1": "", "PS2": "", "TERM": "dumb", "PAGER": "cat", "GIT_PAGER": "cat"},
+            echo=False,
+        )
+
+    def _read_output(self, path: str) -> str:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+
+    def run(self, command: str, cwd: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run command in cwd; on timeout the shell is killed and must be replaced."""
+        marker = f"__MCP_RC_{uuid.uuid4().hex}__"
+        with open(self.script_path, "w", encoding="utf-8") as f:
+            f.write(command + "\n")
+        self.proc.write(
+            # builtin: shell functions defined by earlier commands must not replace the wrapper's own steps
+            f"{{ builtin cd -- {shlex.quote(cwd)} && builtin . {shlex.quote(self.script_path)}; }} "
+            f"</dev/null >{shlex.quote(self.stdout_path)} 2>{shlex.quote(self.stderr_path)}; "
+            f"builtin printf '\\n%s%s\\n' {marker} \"$?\"\n".encode()
+        )
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = re.compile(rb"\r?\n" + marker.encode() + rb"(\d+)\r?\n")
+        buf = bytearray()
+        match = None
+        timed_out = False
+        while match is None:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                timed_out = True
+                break
+            if not select.select([self.proc.fd], [], [], remaining)[0]:
+                continue
+            try:
+                chunk = self.proc.read(65536)
+            except EOFError:  # the command exited the shell
+                break
+            buf += chunk
+            # Only rescan the tail that could contain a marker split across reads
+            match = done.search(buf, max(0, len(buf) - len(chunk) - len(marker) - 32))
+        stdout, stderr = self._read_output(self.stdout_path), self._read_output(self.stderr_path)
+        if match is not None:
+            returncode = int(match.group(1))
+        elif timed_out:
+            self.close()
+            stderr += f"Command timed out after {timeout} seconds; its shell session was reset."
+            returncode = -1
+        else:
+            returncode = self.proc.wait()
+            self.close()
+        return {
+            "stdout": stdout,
+            "stderr": stderr,
+            "returncode": returncode
+        }
+
+    def alive(self) -> bool:
+        return not self.closed and self.proc.isalive()
+
+    def close(self) -> None:
+        self.closed = True
+        if self.proc.isalive():
+            self.proc.terminate(force=True)
+        for path in (self.script_path, self.stdout_path, self.stderr_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+# Persistent shells by base_dir, least recently used first. Beyond _SHELLS_MAX the
+# oldest idle shell is closed; busy ones are left to finish.
+_SHELLS: "OrderedDict[str, _PersistentShell]" = OrderedDict()
+_SHELLS_MAX = 8
+_SHELLS_LOCK = threading.Lock()
+
+@atexit.register
+def _close_shells():
+    for shell in _SHELLS.values():
+        shell.close()
+
+def _get_shell(base_dir: str) -> Optional[_PersistentShell]:
+    """Return the persistent shell for base_dir, or None if no pty shell is available."""
+    if ptyprocess is None or shutil.which("bash") is None:
+        return None
+    key = _resolved_root(base_dir)  # '/ws' and '/ws/' share one session
+    with _SHELLS_LOCK:
+        shell = _SHELLS.get(key)
+        if shell is None or not shell.alive():
+            shell = _SHELLS[key] = _PersistentShell()
+        _SHELLS.move_to_end(key)
+        for old_key in list(_SHELLS)[:-1]:
+            if len(_SHELLS) <= _SHELLS_MAX:
+                break
+            idle = _SHELLS[old_key]
+            if idle.lock.acquire(blocking=False):
+                try:
+                    idle.close()
+                finally:
+                    idle.lock.release()
+                del _SHELLS[old_key]
+        return shell
+
 @mcp.tool()
-def execute_shell_command(command: str, base_dir: str, cwd: str = None) -> Dict[str, Any]:
+def execute_shell_command(command: str, base_dir: str, cwd: str = None, timeout: float = 300) -> Dict[str, Any]:
     """
     Execute a shell command in a specified working directory under a base directory and return the output.
     Prevents execution of dangerous commands that could harm the container or host.
-    """
-    # Blacklist of dangerous commands/patterns
-    blacklist = [
-        'rm -rf', 'rm -r /', 'rm -rf /', 'shutdown', 'reboot', 'poweroff', 'halt',
-        'mkfs', 'dd ', ':(){:|:&}', '>:(', 'kill 1', 'kill -9 1', 'killall', 'init 0',
-        'init 6', 'systemctl', 'chown /', 'chmod 000 /', 'mv /', 'cp /dev/zero',
-        '>/dev/sda', '>/dev/vda', '>/dev/hda', '>/dev/nvme', '>/dev/xvda', '>/dev/mmcblk',
-        '>/dev/sdb', '>/dev/sdc', '>/dev/sdd', '>/dev/sde', '>/dev/sdf', '>/dev/sdg',
-        '>/dev/sdh', '>/dev/sdi', '>/dev/sdj', '>/dev/sdk', '>/dev/sdl', '>/dev/sdm',
-        '>/dev/sdn', '>/dev/sdo', '>/dev/sdp', '>/dev/sdq', '>/dev/sdr', '>/dev/sds',
-        '>/dev/sdt', '>/dev/sdu', '>/dev/sdv', '>/dev/sdw', '>/dev/sdx', '>/dev/sdy',
-        '>/dev/sdz', 'docker stop', 'docker kill', 'docker rm', 'docker rmi', 'docker system prune',
-        'docker-compose down', 'docker-compose rm', 'docker-compose stop', 'docker-compose kill',
-        'crontab -r', 'userdel', 'groupdel', 'passwd', 'su ', 'sudo ', 'visudo', 'adduser', 'addgroup',
-        'deluser', 'delgroup', 'pkill', 'reboot', 'halt', 'poweroff', 'shutdown', 'init '
-    ]
-    lower_command = command.lower()
-    for pattern in blacklist:
-        if pattern in lower_command:
-            return {
-                "stdout": "",
-                "stderr": f"Blocked dangerous command: '{pattern}' detected in input.",
-                "returncode": 126
-            }
-    abs_cwd = os.path.join(base_dir, cwd) if cwd else base_dir
-    result = subprocess.run(command, shell=True, capture_output=True, text=True, cwd=abs_cwd)
+    Commands run in a persistent bash session per base_dir, so exported variables and
+    shell functions carry over between calls; the working directory is reset each call.
+    A call made while that session is busy runs in a one-shot subprocess instead, without
+    the session's state, so concurrent calls never wait on each other. A command still
+    running after timeout seconds (default 300) is killed and returns returncode -1;
+    with a persistent session, that session's state is lost.
+    """
+    hit = _blacklist_hit(command)
+    if hit:
+        return {
+            "stdout": "",
+            "stderr": f"Blocked dangerous command: '{hit}' detected in input.",
+            "returncode": 126
+        }
+    abs_cwd = _safe_join(base_dir, cwd or ".")
+    while True:
+        shell = _get_shell(base_dir)
+        if shell is None or not shell.lock.acquire(blocking=False):
+            break  # no pty shell, or it is busy with another call: run one-shot below
+        try:
+            # The shell may have been evicted or killed between lookup and lock
+            if shell.alive():
+                return shell.run(command, abs_cwd, timeout)
+        finally:
+            shell.lock.release()
+    try:
+        result = subprocess.run(command, shell=True, capture_output=True, text=True, cwd=abs_cwd, timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        return {
+            "stdout": e.stdout.decode("utf-8", errors="replace") if isinstance(e.stdout, bytes) else e.stdout or "",
+            "stderr": f"Command timed out after {timeout} seconds.",
+            "returncode": -1
+        }
     return {
         "stdout": result.stdout,
         "stderr": result.stderr,
@@ -193,16 +561,16 @@ def get_file_info(base_dir: str, path: str) -> Dict[str, Any]:
     
     Use case: To inspect file properties, such as size, type, or modification time, for project management or validation.
     """
-    abs_path = os.path.join(base_dir, path)
-    stat = os.stat(abs_path)
+    abs_path = _safe_join(base_dir, path)
+    st = os.stat(abs_path)
     return {
         "path": abs_path,
-        "is_file": os.path.isfile(abs_path),
-        "is_dir": os.path.isdir(abs_path),
-        "size": stat.st_size,
-        "created": stat.st_ctime,
-        "modified": stat.st_mtime,
-        "mode": stat.st_mode
+        "is_file": stat.S_ISREG(st.st_mode),
+        "is_dir": stat.S_ISDIR(st.st_mode),
+        "size": st.st_size,
+        "created": st.st_ctime,
+        "modified": st.st_mtime,
+        "mode": st.st_mode
     }
 
 @mcp.tool()
@@ -212,7 +580,8 @@ def search_files(base_dir: str, pattern: str, root: str = ".") -> List[str]:
     
     Parameters:
         base_dir (str): The absolute path to the root directory the agent is allowed to access.
-        pattern (str): The filename pattern to search for (e.g., '*.py' for Python files).
+        pattern (str): The filename pattern to search for (e.g., '*.py' for Python files). Patterns with a
+            path separator (e.g., 'src/*.py', '**/test_*.py') match trailing path components instead.
         root (str, optional): The relative path from base_dir to start the search (default is ".").
     
     Returns:
@@ -220,8 +589,26 @@ def search_files(base_dir: str, pattern: str, root: str = ".") -> List[str]:
     
     Use case: To find files of a certain type or name, such as all Python scripts or README files in a project.
     """
-    abs_root = os.path.join(base_dir, root)
-    return glob.glob(os.path.join(abs_root, "**", pattern), recursive=True)
+    abs_root = _safe_join(base_dir, root)
+    if "/" in pattern or os.sep in pattern:
+        # Multi-component patterns need glob's own matcher; name-only patterns take the scandir walk below
+        return glob.glob(os.path.join(abs_root, "**", pattern), recursive=True)
+    # Like glob's "**", hidden entries are skipped unless the pattern itself starts with "."
+    include_hidden = pattern.startswith(".")
+    def walk(dir_path):
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return
+        for entry in entries:
+            hidden = entry.name.startswith(".")
+            # fnmatchcase keeps its own cache of compiled patterns
+            if fnmatch.fnmatchcase(entry.name, pattern) and (include_hidden or not hidden):
+                yield entry.path
+            if not hidden and entry.is_dir(follow_symlinks=False):
+                yield from walk(entry.path)
+    return list(walk(abs_root))
 
 @mcp.tool()
 def zip_files(base_dir: str, zip_path: str, files: List[str]) -> None:
@@ -238,10 +625,11 @@ def zip_files(base_dir: str, zip_path: str, files: List[str]) -> None:
     
     Use case: To package multiple files for download, backup, or sharing.
     """
-    abs_zip_path = os.path.join(base_dir, zip_path)
-    with zipfile.ZipFile(abs_zip_path, 'w') as zipf:
+    abs_zip_path = _safe_join(base_dir, zip_path)
+    with open(abs_zip_path, 'wb', buffering=1 << 20) as fh, \
+            zipfile.ZipFile(fh, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
         for file in files:
-            abs_file = os.path.join(base_dir, file)
+            abs_file = _safe_join(base_dir, file)
             zipf.write(abs_file, arcname=os.path.basename(abs_file))
 
 @mcp.tool()
@@ -259,8 +647,8 @@ def unzip_file(base_dir: str, zip_path: str, extract_to: str) -> None:
     
     Use case: To unpack downloaded or received zip files into a project workspace.
     """
-    abs_zip_path = os.path.join(base_dir, zip_path)
-    abs_extract_to = os.path.join(base_dir, extract_to)
+    abs_zip_path = _safe_join(base_dir, zip_path)
+    abs_extract_to = _safe_join(base_dir, extract_to)
     with zipfile.ZipFile(abs_zip_path, 'r') as zipf:
         zipf.extractall(abs_extract_to)
 
@@ -279,27 +667,41 @@ def directory_tree(base_dir: str, path: str = ".", max_depth: int = 3) -> str:
     
     Use case: To visualize the folder structure of a project or workspace for navigation or planning.
     """
-    abs_path = os.path.join(base_dir, path)
-    def tree(dir_path, prefix="", depth=0):
-        if depth > max_depth:
-            return ""
-        entries = []
+    abs_path = _safe_join(base_dir, path)
+    out = [f"{abs_path}\n"]
+    # Iterative DFS: each frame is (entry iterator, entry count, line prefix, depth)
+    stack = []
+    def push(dir_path, prefix, depth):
         try:
-            entries = os.listdir(dir_path)
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
         except Exception:
-            return prefix + "[Permission Denied]\n"
-        result = ""
-        for i, entry in enumerate(sorted(entries)):
-            full_path = os.path.join(dir_path, entry)
-            connector = "└── " if i == len(entries) - 1 else "├── "
-            result += f"{prefix}{connector}{entry}\n"
-            if os.path.isdir(full_path):
-                extension = "    " if i == len(entries) - 1 else "│   "
-                result += tree(full_path, prefix + extension, depth + 1)
-        return result
-    return f"{abs_path}\n" + tree(abs_path)
+            out.append(prefix + "[Permission Denied]\n")
+            return
+        stack.append((enumerate(entries), len(entries), prefix, depth))
+    if max_depth >= 0:
+        push(abs_path, "", 0)
+    while stack:
+        entries, count, prefix, depth = stack[-1]
+        i, entry = next(entries, (None, None))
+        if entry is None:
+            stack.pop()
+            continue
+        last = i == count - 1
+        out.append(f"{prefix}{'└── ' if last else '├── '}{entry.name}\n")
+        if depth < max_depth and entry.is_dir(follow_symlinks=False):
+            push(entry.path, prefix + ("    " if last else "│   "), depth + 1)
+    return "".join(out)
 
 # The following tools are not directory-restricted and remain global
+_SYSINFO = {
+    "os": platform.system(),
+    "os_version": platform.version(),
+    "platform": platform.platform(),
+    "cpu": platform.processor(),
+    "hostname": socket.gethostname(),
+}
+
 @mcp.tool()
 def get_system_info() -> Dict[str, Any]:
     """
@@ -310,14 +712,11 @@ def get_system_info() -> Dict[str, Any]:
     
     Use case: To gather environment details for debugging, reporting, or system checks.
     """
+    cwd = os.getcwd()
     return {
-        "os": platform.system(),
-        "os_version": platform.version(),
-        "platform": platform.platform(),
-        "cpu": platform.processor(),
-        "hostname": socket.gethostname(),
-        "cwd": os.getcwd(),
-        "disk_usage": shutil.disk_usage(os.getcwd())
+        **_SYSINFO,
+        "cwd": cwd,
+        "disk_usage": shutil.disk_usage(cwd)
     }
 
 @mcp.tool()
@@ -335,12 +734,7 @@ def ping_host(host: str, count: int = 1) -> Dict[str, Any]:
     Use case: To check network connectivity or latency to a server or website from the MCP server's machine.
     """
     try:
-        if platform.system().lower() == "windows":
-            param = "-n"
-        else:
-            param = "-c"
-        
-        result = subprocess.run(["ping", param, str(count), host], capture_output=True, text=True, timeout=30)
+        result = subprocess.run(["ping", _PING_PARAM, str(count), host], capture_output=True, text=True, timeout=30)
         return {
             "stdout": result.stdout,
             "stderr": result.stderr,
@@ -365,6 +759,15 @@ def ping_host(host: str, count: int = 1) -> Dict[str, Any]:
             "returncode": -1
         }
 
+# Shared session so repeated requests to a host reuse pooled keep-alive connections.
+# Cookies are refused to keep each tool call stateless, as with bare requests.request().
+_SESSION = requests.Session()
+_SESSION.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+for _scheme in ("http://", "https://"):
+    _SESSION.mount(_scheme, HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0))
+
+_PREALLOCATE_MIN_SIZE = 64 << 20
+
 @mcp.tool()
 def download_url(url: str, save_path: str) -> None:
     """
@@ -379,10 +782,20 @@ def download_url(url: str, save_path: str) -> None:
     
     Use case: To fetch resources, datasets, or code from the internet for use in a project or analysis.
     """
-    r = requests.get(url)
-    r.raise_for_status()
-    with open(save_path, "wb") as f:
-        f.write(r.content)
+    with _SESSION.get(url, stream=True, timeout=60) as r:
+        r.raise_for_status()
+        r.raw.decode_content = True
+        size = int(r.headers.get("Content-Length") or 0)
+        encoded = r.headers.get("Content-Encoding", "identity") != "identity"
+        with open(save_path, "wb", buffering=1 << 20) as f:
+            if size > _PREALLOCATE_MIN_SIZE and not encoded and hasattr(os, "posix_fallocate"):
+                # Reserve the blocks up front: less fragmentation, and ENOSPC fails before the transfer
+                try:
+                    os.posix_fallocate(f.fileno(), 0, size)
+                except OSError:
+                    pass
+            shutil.copyfileobj(r.raw, f, length=1 << 20)
+            f.truncate()  # drop any preallocated tail if the body came up short
 
 @mcp.tool()
 def list_processes() -> List[Dict[str, Any]]:
@@ -396,7 +809,7 @@ def list_processes() -> List[Dict[str, Any]]:
     """
     processes = []
     try:
-        if platform.system().lower() == "windows":
+        if _IS_WINDOWS:
             result = subprocess.run(["tasklist"], capture_output=True, text=True)
             for line in result.stdout.splitlines()[3:]:
                 parts = line.split()
@@ -416,11 +829,13 @@ def list_processes() -> List[Dict[str, Any]]:
                         pass
             except ImportError:
                 # Fallback to ps command
-                result = subprocess.run(["ps", "-eo", "pid,comm"], capture_output=True, text=True)
+                result = subprocess.run(["ps", "-eo", "pid,comm"], capture_output=True, text=True, check=False,
+                                        env={**os.environ, "LC_ALL": "C"})
                 for line in result.stdout.splitlines()[1:]:
-                    parts = line.strip().split(None, 1)
-                    if len(parts) == 2:
-                        processes.append({"pid": parts[0], "name": parts[1]})
+                    pid, _, name = line.lstrip().partition(" ")
+                    name = name.strip()
+                    if name:
+                        processes.append({"pid": pid, "name": name})
     except Exception as e:
         processes.append({"error": str(e)})
     return processes
@@ -455,7 +870,7 @@ def http_request_tool(method: str, url: str, headers: Optional[Dict[str, str]] =
         dict: {status_code, headers, text, json (if possible)}
     """
     try:
-        resp = requests.request(method, url, headers=headers, data=data, json=json_data, timeout=timeout)
+        resp = _SESSION.request(method, url, headers=headers, data=data, json=json_data, timeout=timeout)
         try:
             resp_json = resp.json()
         except Exception:
@@ -482,10 +897,15 @@ def search_and_replace(base_dir: str, path: str, search: str, replace: str, coun
     Returns:
         int: Number of replacements made.
     """
-    abs_path = os.path.join(base_dir, path)
+    abs_path = _safe_join(base_dir, path)
     with open(abs_path, 'r', encoding='utf-8') as f:
         content = f.read()
-    new_content, n = content.replace(search, replace, count), content.count(search) if count == -1 else min(content.count(search), count)
+    new_content = content.replace(search, replace, count)
+    if len(search) != len(replace):
+        # Every replacement changes the length by the same amount, so the count falls out of the size delta
+        n = (len(new_content) - len(content)) // (len(replace) - len(search))
+    else:
+        n = content.count(search) if count == -1 else min(content.count(search), count)
     with open(abs_path, 'w', encoding='utf-8') as f:
         f.write(new_content)
     return n
@@ -502,11 +922,13 @@ def file_diff(base_dir: str, path1: str, path2: str, context: int = 3) -> str:
     Returns:
         str: Unified diff as a string.
     """
-    abs1 = os.path.join(base_dir, path1)
-    abs2 = os.path.join(base_dir, path2)
-    with open(abs1, 'r', encoding='utf-8') as f1, open(abs2, 'r', encoding='utf-8') as f2:
+    abs1 = _safe_join(base_dir, path1)
+    abs2 = _safe_join(base_dir, path2)
+    with open(abs1, 'r', encoding='utf-8', buffering=1 << 20) as f1, open(abs2, 'r', encoding='utf-8', buffering=1 << 20) as f2:
         lines1 = f1.readlines()
         lines2 = f2.readlines()
+    if lines1 == lines2:
+        return ""
     diff = difflib.unified_diff(lines1, lines2, fromfile=path1, tofile=path2, n=context)
     return ''.join(diff)
 
@@ -520,7 +942,7 @@ def format_code(base_dir: str, path: str) -> Dict[str, Any]:
     Returns:
         dict: {"success": bool, "stdout": str, "stderr": str}
     """
-    abs_path = os.path.join(base_dir, path)
+    abs_path = _safe_join(base_dir, path)
     ext = os.path.splitext(abs_path)[1].lower()
     if ext == ".py":
         cmd = ["black", abs_path, "--quiet"]
@@ -531,19 +953,61 @@ def format_code(base_dir: str, path: str) -> Dict[str, Any]:
     result = subprocess.run(cmd, capture_output=True, text=True)
     return {"success": result.returncode == 0, "stdout": result.stdout, "stderr": result.stderr}
 
+# Recently rendered HTML from browser_open_page: url -> (fetched_at, html), least recently used first
+_PAGE_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_PAGE_CACHE_MAX = 64
+_PAGE_CACHE_LOCK = threading.Lock()
+
+def _page_cache_get(url: str) -> Optional[str]:
+    with _PAGE_CACHE_LOCK:
+        hit = _PAGE_CACHE.get(url)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] >= BROWSER_PAGE_TTL:
+            del _PAGE_CACHE[url]
+            return None
+        _PAGE_CACHE.move_to_end(url)
+        return hit[1]
+
+def _page_cache_put(url: str, html: str) -> None:
+    if BROWSER_PAGE_TTL <= 0:
+        return
+    with _PAGE_CACHE_LOCK:
+        _PAGE_CACHE[url] = (time.monotonic(), html)
+        _PAGE_CACHE.move_to_end(url)
+        while len(_PAGE_CACHE) > _PAGE_CACHE_MAX:
+            _PAGE_CACHE.popitem(last=False)
+
 @mcp.tool()
 def browser_open_page(url: str) -> str:
     """
     Open a web page and return its HTML content.
+    Results are cached per URL for BROWSER_PAGE_TTL seconds (default 30); use browser_cache_clear to force a reload.
     """
+    cached = _page_cache_get(url)
+    if cached is not None:
+        return cached
     async def _open():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        content = await page.content()
-        await page.close()
-        return content
-    return asyncio.get_event_loop().run_until_complete(_open())
+        async with _pooled_page() as page:
+            await page.goto(url)
+            return await page.content()
+    content = _run(_open())
+    _page_cache_put(url, content)
+    return content
+
+@mcp.tool()
+def browser_cache_clear(url: Optional[str] = None) -> int:
+    """
+    Clear cached page HTML used by browser_open_page.
+    If url is given only that entry is dropped, otherwise the whole cache is cleared.
+    Returns the number of entries removed.
+    """
+    with _PAGE_CACHE_LOCK:
+        if url is not None:
+            return 1 if _PAGE_CACHE.pop(url, None) is not None else 0
+        removed = len(_PAGE_CACHE)
+        _PAGE_CACHE.clear()
+        return removed
 
 @mcp.tool()
 def browser_screenshot(url: str, path: str = "screenshot.png") -> str:
@@ -551,13 +1015,11 @@ def browser_screenshot(url: str, path: str = "screenshot.png") -> str:
     Take a screenshot of a web page and save it to a file.
     """
     async def _shot():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        await page.screenshot(path=path)
-        await page.close()
-        return path
-    return asyncio.get_event_loop().run_until_complete(_shot())
+        async with _pooled_page() as page:
+            await page.goto(url)
+            await page.screenshot(path=path)
+            return path
+    return _run(_shot())
 
 @mcp.tool()
 def browser_click(url: str, selector: str, wait_for: Optional[str] = None) -> str:
@@ -566,16 +1028,13 @@ def browser_click(url: str, selector: str, wait_for: Optional[str] = None) -> st
     Optionally wait for another selector to appear after the click.
     """
     async def _click():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        await page.click(selector)
-        if wait_for:
-            await page.wait_for_selector(wait_for)
-        content = await page.content()
-        await page.close()
-        return content
-    return asyncio.get_event_loop().run_until_complete(_click())
+        async with _pooled_page() as page:
+            await page.goto(url)
+            await page.click(selector)
+            if wait_for:
+                await page.wait_for_selector(wait_for)
+            return await page.content()
+    return _run(_click())
 
 @mcp.tool()
 def browser_type(url: str, selector: str, text: str, submit_selector: Optional[str] = None, wait_for: Optional[str] = None) -> str:
@@ -584,18 +1043,15 @@ def browser_type(url: str, selector: str, text: str, submit_selector: Optional[s
     Optionally wait for another selector to appear after the action.
     """
     async def _type():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        await page.fill(selector, text)
-        if submit_selector:
-            await page.click(submit_selector)
-        if wait_for:
-            await page.wait_for_selector(wait_for)
-        content = await page.content()
-        await page.close()
-        return content
-    return asyncio.get_event_loop().run_until_complete(_type())
+        async with _pooled_page() as page:
+            await page.goto(url)
+            await page.fill(selector, text)
+            if submit_selector:
+                await page.click(submit_selector)
+            if wait_for:
+                await page.wait_for_selector(wait_for)
+            return await page.content()
+    return _run(_type())
 
 @mcp.tool()
 def browser_extract(url: str, selector: str, attr: Optional[str] = None, all_matches: bool = False) -> Any:
@@ -605,27 +1061,26 @@ def browser_extract(url: str, selector: str, attr: Optional[str] = None, all_mat
     If all_matches is True, return a list of all matches; else, return the first match.
     """
     async def _extract():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        if all_matches:
-            handles = await page.query_selector_all(selector)
-            if attr:
-                results = [await h.get_attribute(attr) for h in handles]
-            else:
-                results = [await h.inner_text() for h in handles]
-        else:
-            handle = await page.query_selector(selector)
-            if handle:
+        async with _pooled_page() as page:
+            await page.goto(url)
+            if all_matches:
                 if attr:
-                    results = await handle.get_attribute(attr)
+                    results = await page.eval_on_selector_all(selector, "(els, attr) => els.map(e => e.getAttribute(attr))", attr)
                 else:
-                    results = await handle.inner_text()
+                    handles = await page.query_selector_all(selector)
+                    # Issue every inner_text() at once so the round-trips overlap on the driver connection
+                    results = list(await asyncio.gather(*(h.inner_text() for h in handles)))
             else:
-                results = None
-        await page.close()
-        return results
-    return asyncio.get_event_loop().run_until_complete(_extract())
+                handle = await page.query_selector(selector)
+                if handle:
+                    if attr:
+                        results = await handle.get_attribute(attr)
+                    else:
+                        results = await handle.inner_text()
+                else:
+                    results = None
+            return results
+    return _run(_extract())
 
 @mcp.tool()
 def browser_wait_for_element(url: str, selector: str, timeout: int = 30000) -> str:
@@ -634,14 +1089,11 @@ def browser_wait_for_element(url: str, selector: str, timeout: int = 30000) -> s
     Useful for dynamic content that loads after the initial page load.
     """
     async def _wait():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        await page.wait_for_selector(selector, timeout=timeout)
-        content = await page.content()
-        await page.close()
-        return content
-    return asyncio.get_event_loop().run_until_complete(_wait())
+        async with _pooled_page() as page:
+            await page.goto(url)
+            await page.wait_for_selector(selector, timeout=timeout)
+            return await page.content()
+    return _run(_wait())
 
 @mcp.tool()
 def browser_scroll_and_extract(url: str, selector: str, scroll_selector: Optional[str] = None, max_scrolls: int = 5) -> List[str]:
@@ -650,37 +1102,36 @@ def browser_scroll_and_extract(url: str, selector: str, scroll_selector: Optiona
     Useful for infinite scroll pages or lazy-loaded content.
     """
     async def _scroll_extract():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        
-        results = []
-        last_height = await page.evaluate("document.body.scrollHeight")
-        
-        for _ in range(max_scrolls):
-            # Extract current elements
-            elements = await page.query_selector_all(selector)
-            for element in elements:
-                text = await element.inner_text()
-                if text and text not in results:
-                    results.append(text)
+        async with _pooled_page() as page:
+            await page.goto(url)
             
-            # Scroll down
-            if scroll_selector:
-                await page.click(scroll_selector)
-            else:
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            results = []
+            seen = set()
+            last_height = await page.evaluate("document.body.scrollHeight")
             
-            await page.wait_for_timeout(2000)  # Wait for content to load
+            for _ in range(max_scrolls):
+                # Extract current elements in a single round trip to the browser
+                texts = await page.eval_on_selector_all(selector, "els => els.map(e => e.innerText)")
+                for text in texts:
+                    if text and text not in seen:
+                        seen.add(text)
+                        results.append(text)
+                
+                # Scroll down
+                if scroll_selector:
+                    await page.click(scroll_selector)
+                else:
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                
+                await page.wait_for_timeout(2000)  # Wait for content to load
+                
+                new_height = await page.evaluate("document.body.scrollHeight")
+                if new_height == last_height:
+                    break
+                last_height = new_height
             
-            new_height = await page.evaluate("document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
-        
-        await page.close()
-        return results
-    return asyncio.get_event_loop().run_until_complete(_scroll_extract())
+            return results
+    return _run(_scroll_extract())
 
 @mcp.tool()
 def browser_fill_form(url: str, form_data: Dict[str, str], submit_selector: Optional[str] = None, wait_for: Optional[str] = None) -> str:
@@ -689,23 +1140,20 @@ def browser_fill_form(url: str, form_data: Dict[str, str], submit_selector: Opti
     form_data should be a dictionary mapping selectors to values.
     """
     async def _fill_form():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        
-        for selector, value in form_data.items():
-            await page.fill(selector, value)
-        
-        if submit_selector:
-            await page.click(submit_selector)
-        
-        if wait_for:
-            await page.wait_for_selector(wait_for)
-        
-        content = await page.content()
-        await page.close()
-        return content
-    return asyncio.get_event_loop().run_until_complete(_fill_form())
+        async with _pooled_page() as page:
+            await page.goto(url)
+            
+            for selector, value in form_data.items():
+                await page.fill(selector, value)
+            
+            if submit_selector:
+                await page.click(submit_selector)
+            
+            if wait_for:
+                await page.wait_for_selector(wait_for)
+            
+            return await page.content()
+    return _run(_fill_form())
 
 @mcp.tool()
 def browser_handle_dialog(url: str, action: str = "accept", prompt_text: Optional[str] = None) -> str:
@@ -714,21 +1162,17 @@ def browser_handle_dialog(url: str, action: str = "accept", prompt_text: Optiona
     action can be 'accept', 'dismiss', or 'prompt'.
     """
     async def _handle_dialog():
-        browser = await get_browser()
-        page = await browser.new_page()
-        
-        if action == "accept":
-            page.on("dialog", lambda dialog: dialog.accept())
-        elif action == "dismiss":
-            page.on("dialog", lambda dialog: dialog.dismiss())
-        elif action == "prompt" and prompt_text:
-            page.on("dialog", lambda dialog: dialog.accept(prompt_text))
-        
-        await page.goto(url)
-        content = await page.content()
-        await page.close()
-        return content
-    return asyncio.get_event_loop().run_until_complete(_handle_dialog())
+        async with _pooled_page() as page:
+            if action == "accept":
+                page.on("dialog", lambda dialog: dialog.accept())
+            elif action == "dismiss":
+                page.on("dialog", lambda dialog: dialog.dismiss())
+            elif action == "prompt" and prompt_text:
+                page.on("dialog", lambda dialog: dialog.accept(prompt_text))
+            
+            await page.goto(url)
+            return await page.content()
+    return _run(_handle_dialog())
 
 @mcp.tool()
 def browser_upload_file(url: str, file_input_selector: str, file_path: str) -> str:
@@ -736,19 +1180,16 @@ def browser_upload_file(url: str, file_input_selector: str, file_path: str) -> s
     Upload a file to a web page using a file input element.
     """
     async def _upload():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        
-        with page.expect_file_chooser() as fc_info:
-            await page.click(file_input_selector)
-        file_chooser = fc_info.value
-        await file_chooser.set_files(file_path)
-        
-        content = await page.content()
-        await page.close()
-        return content
-    return asyncio.get_event_loop().run_until_complete(_upload())
+        async with _pooled_page() as page:
+            await page.goto(url)
+            
+            with page.expect_file_chooser() as fc_info:
+                await page.click(file_input_selector)
+            file_chooser = fc_info.value
+            await file_chooser.set_files(file_path)
+            
+            return await page.content()
+    return _run(_upload())
 
 @mcp.tool()
 def browser_get_network_requests(url: str, request_type: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -757,27 +1198,24 @@ def browser_get_network_requests(url: str, request_type: Optional[str] = None) -
     request_type can be 'GET', 'POST', 'XHR', etc.
     """
     async def _capture_requests():
-        browser = await get_browser()
-        page = await browser.new_page()
-        
-        requests_data = []
-        
-        def handle_request(request):
-            if not request_type or request.method == request_type:
-                requests_data.append({
-                    "url": request.url,
-                    "method": request.method,
-                    "headers": request.headers,
-                    "post_data": request.post_data
-                })
-        
-        page.on("request", handle_request)
-        await page.goto(url)
-        await page.wait_for_timeout(5000)  # Wait for requests to complete
-        
-        await page.close()
-        return requests_data
-    return asyncio.get_event_loop().run_until_complete(_capture_requests())
+        async with _pooled_page() as page:
+            requests_data = []
+            
+            def handle_request(request):
+                if not request_type or request.method == request_type:
+                    requests_data.append({
+                        "url": request.url,
+                        "method": request.method,
+                        "headers": request.headers,
+                        "post_data": request.post_data
+                    })
+            
+            page.on("request", handle_request)
+            await page.goto(url)
+            await page.wait_for_timeout(5000)  # Wait for requests to complete
+            
+            return requests_data
+    return _run(_capture_requests())
 
 @mcp.tool()
 def browser_execute_javascript(url: str, script: str) -> Any:
@@ -785,37 +1223,66 @@ def browser_execute_javascript(url: str, script: str) -> Any:
     Execute custom JavaScript code on the page and return the result.
     """
     async def _execute_js():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        
-        result = await page.evaluate(script)
-        await page.close()
-        return result
-    return asyncio.get_event_loop().run_until_complete(_execute_js())
+        async with _pooled_page() as page:
+            await page.goto(url)
+            return await page.evaluate(script)
+    return _run(_execute_js())
+
+_PAGE_INFO_FIELDS = ("title", "url", "viewport", "html", "text", "screenshot")
+
+# Title, serialized HTML (as page.content() builds it) and body text in one evaluation
+_PAGE_INFO_SCRIPT = """([html, text]) => {
+    let content = null;
+    if (html) {
+        content = document.doctype ? new XMLSerializer().serializeToString(document.doctype) : '';
+        content += document.documentElement ? document.documentElement.outerHTML : '';
+    }
+    return [document.title, content, text && document.body ? document.body.textContent : null];
+}"""
 
 @mcp.tool()
-def browser_get_page_info(url: str) -> Dict[str, Any]:
+def browser_get_page_info(url: str, fields: Optional[List[str]] = None, screenshot_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Get comprehensive information about the page including title, URL, viewport, and more.
-    """
+    fields selects what to return from: title, url, viewport, html, text, screenshot
+    (default title, url, text). The JPEG screenshot is written to screenshot_path when
+    given (which implies 'screenshot'); otherwise only its size and sha256 are returned,
+    keeping image bytes out of the response.
+    """
+    wanted = set(fields) if fields is not None else {"title", "url", "text"}
+    unknown = wanted.difference(_PAGE_INFO_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Supported: {', '.join(_PAGE_INFO_FIELDS)}")
+    if screenshot_path:
+        wanted.add("screenshot")
     async def _get_info():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        
-        info = {
-            "title": await page.title(),
-            "url": page.url,
-            "viewport": await page.viewport_size(),
-            "content": await page.content(),
-            "text_content": await page.text_content("body"),
-            "screenshot": await page.screenshot(type="jpeg", quality=80)
-        }
-        
-        await page.close()
-        return info
-    return asyncio.get_event_loop().run_until_complete(_get_info())
+        async with _pooled_page() as page:
+            await page.goto(url)
+            
+            info = {}
+            if wanted & {"title", "html", "text"}:
+                title, content, text = await page.evaluate(_PAGE_INFO_SCRIPT, ["html" in wanted, "text" in wanted])
+                if "title" in wanted:
+                    info["title"] = title
+                if "html" in wanted:
+                    info["content"] = content
+                if "text" in wanted:
+                    info["text_content"] = text
+            if "url" in wanted:
+                info["url"] = page.url
+            if "viewport" in wanted:
+                info["viewport"] = page.viewport_size
+            if "screenshot" not in wanted:
+                return info
+            if screenshot_path:
+                await page.screenshot(path=screenshot_path, type="jpeg", quality=80)
+                info["screenshot_path"] = screenshot_path
+            else:
+                shot = await page.screenshot(type="jpeg", quality=80)
+                info["screenshot_size"] = len(shot)
+                info["screenshot_sha256"] = hashlib.sha256(shot).hexdigest()
+            return info
+    return _run(_get_info())
 
 @mcp.tool()
 def browser_navigate_with_cookies(url: str, cookies: List[Dict[str, Any]]) -> str:
@@ -823,37 +1290,30 @@ def browser_navigate_with_cookies(url: str, cookies: List[Dict[str, Any]]) -> st
     Navigate to a URL with custom cookies set.
     """
     async def _navigate_with_cookies():
-        browser = await get_browser()
-        page = await browser.new_page()
-        
-        await page.context.add_cookies(cookies)
-        await page.goto(url)
-        
-        content = await page.content()
-        await page.close()
-        return content
-    return asyncio.get_event_loop().run_until_complete(_navigate_with_cookies())
+        _A11Y_CACHE.pop(url, None)  # the page may render differently with these cookies
+        async with _pooled_page() as page:
+            try:
+                await page.context.add_cookies(cookies)
+                await page.goto(url)
+                return await page.content()
+            finally:
+                # Contexts are pooled, so don't let these cookies leak into other tools
+                await page.context.clear_cookies()
+    return _run(_navigate_with_cookies())
 
 @mcp.tool()
 def browser_compare_pages(url1: str, url2: str, selector: str) -> Dict[str, Any]:
     """
     Compare content between two pages using a specific selector.
     """
+    async def _fetch(url):
+        async with _pooled_page(block_resources=True) as page:
+            await page.goto(url)
+            return await page.text_content(selector)
+
     async def _compare():
-        browser = await get_browser()
-        
-        # Get content from first page
-        page1 = await browser.new_page()
-        await page1.goto(url1)
-        content1 = await page1.text_content(selector)
-        await page1.close()
-        
-        # Get content from second page
-        page2 = await browser.new_page()
-        await page2.goto(url2)
-        content2 = await page2.text_content(selector)
-        await page2.close()
-        
+        # Load both pages at once on separate pooled contexts so their network waits overlap
+        content1, content2 = await asyncio.gather(_fetch(url1), _fetch(url2))
         return {
             "url1": url1,
             "url2": url2,
@@ -862,49 +1322,67 @@ def browser_compare_pages(url1: str, url2: str, selector: str) -> Dict[str, Any]
             "identical": content1 == content2,
             "length_diff": len(content1) - len(content2) if content1 and content2 else None
         }
-    return asyncio.get_event_loop().run_until_complete(_compare())
+    return _run(_compare())
+
+# Accessibility reports: url -> (DOM fingerprint, report), least recently used first.
+# Only touched from coroutines on _LOOP, so no lock is needed.
+_A11Y_CACHE: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+_A11Y_CACHE_MAX = 128
 
 @mcp.tool()
 def browser_generate_accessibility_report(url: str) -> Dict[str, Any]:
     """
     Generate an accessibility report for the page using Playwright's built-in accessibility features.
+    The report is reused while the loaded page keeps the same HTML length and title.
     """
     async def _accessibility_report():
-        browser = await get_browser()
-        page = await browser.new_page()
-        await page.goto(url)
-        
-        # Get accessibility snapshot
-        snapshot = await page.accessibility.snapshot()
-        
-        # Check for common accessibility issues
-        issues = []
-        
-        # Check for images without alt text
-        images = await page.query_selector_all("img")
-        for img in images:
-            alt = await img.get_attribute("alt")
-            if not alt:
-                issues.append("Image missing alt text")
-        
-        # Check for form labels
-        inputs = await page.query_selector_all("input")
-        for inp in inputs:
-            id_attr = await inp.get_attribute("id")
-            if id_attr:
-                label = await page.query_selector(f"label[for='{id_attr}']")
-                if not label:
-                    issues.append(f"Input with id '{id_attr}' missing label")
-        
-        await page.close()
+        async with _pooled_page(block_resources=True) as page:
+            await page.goto(url)
+            fingerprint = await page.evaluate("document.documentElement.outerHTML.length + ':' + document.title")
+            hit = _A11Y_CACHE.get(url)
+            if hit is not None and hit[0] == fingerprint:
+                _A11Y_CACHE.move_to_end(url)
+                return hit[1]
+            
+            # Get accessibility snapshot
+            snapshot = await page.accessibility.snapshot()
+            
+            # Check for common accessibility issues
+            issues = []
+            
+            # Check for images without alt text (one page evaluation rather than a round-trip per image)
+            missing_alts = await page.eval_on_selector_all("img", "els => els.filter(e => !e.getAttribute('alt')).length")
+            issues.extend(["Image missing alt text"] * missing_alts)
+            
+            # Check for form labels
+            unlabeled = await page.eval_on_selector_all(
+                "input",
+                """els => els.map(e => e.getAttribute('id'))
+                    .filter(id => id && !document.querySelector('label[for="' + CSS.escape(id) + '"]'))""",
+            )
+            issues.extend(f"Input with id '{id_attr}' missing label" for id_attr in unlabeled)
         
-        return {
+        report = {
             "url": url,
             "accessibility_snapshot": snapshot,
             "issues_found": issues,
             "total_issues": len(issues)
         }
-    return asyncio.get_event_loop().run_until_complete(_accessibility_report())
+        _A11Y_CACHE[url] = (fingerprint, report)
+        _A11Y_CACHE.move_to_end(url)
+        while len(_A11Y_CACHE) > _A11Y_CACHE_MAX:
+            _A11Y_CACHE.popitem(last=False)
+        return report
+    return _run(_accessibility_report())
+
+_MATH_OPS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+    "power": operator.pow,
+    "sqrt": lambda a, _b: math.sqrt(a),
+}
 
 @mcp.tool()
 def math_operation(operation: str, a: float, b: float = None) -> float:
@@ -912,24 +1390,14 @@ def math_operation(operation: str, a: float, b: float = None) -> float:
     Perform a math operation. Supported operations: add, subtract, multiply, divide, power, sqrt.
     For 'sqrt', only 'a' is used.
     """
-    if operation == "add":
-        return a + b
-    elif operation == "subtract":
-        return a - b
-    elif operation == "multiply":
-        return a * b
-    elif operation == "divide":
-        if b == 0:
-            raise ValueError("Division by zero.")
-        return a / b
-    elif operation == "power":
-        return a ** b
-    elif operation == "sqrt":
-        if a < 0:
-            raise ValueError("Cannot take sqrt of negative number.")
-        return math.sqrt(a)
-    else:
+    op = _MATH_OPS.get(operation)
+    if op is None:
         raise ValueError(f"Unsupported operation: {operation}")
+    if operation == "divide" and b == 0:
+        raise ValueError("Division by zero.")
+    if operation == "sqrt" and a < 0:
+        raise ValueError("Cannot take sqrt of negative number.")
+    return op(a, b)
 
 @mcp.tool()
 def time_operation(operation: str, dt: str = None, fmt: str = None, date_str: str = None) -> Any:
@@ -946,7 +1414,7 @@ def time_operation(operation: str, dt: str = None, fmt: str = None, date_str: st
     elif operation == "today":
         return datetime.date.today().isoformat()
     elif operation == "timestamp":
-        return datetime.datetime.now().timestamp()
+        return time.time()
     elif operation == "format":
         if not dt or not fmt:
             raise ValueError("'dt' and 'fmt' are required for 'format' operation.")
@@ -961,34 +1429,44 @@ def time_operation(operation: str, dt: str = None, fmt: str = None, date_str: st
         raise ValueError(f"Unsupported operation: {operation}")
 
 @mcp.tool()
-def wait_operation(seconds: float, mode: str = "blocking") -> str:
+async def wait_operation(seconds: float, mode: str = "blocking") -> str:
     """
     Wait for a specified number of seconds. Useful for rate limiting, waiting for external events, or simulating delays.
     Parameters:
         seconds (float): Number of seconds to wait (can be fractional).
-        mode (str, optional): 'blocking' (default, uses time.sleep) or 'async' (uses asyncio.sleep).
+        mode (str, optional): 'blocking' (default) or 'async'. Both wait on the server's event loop,
+            so a pending wait ties up no worker thread; the mode only labels the result.
     Returns:
         str: A message indicating the wait is complete.
     """
-    if mode == "blocking":
-        time.sleep(seconds)
-        return f"Waited {seconds} seconds (blocking)."
-    elif mode == "async":
-        async def _wait():
-            await asyncio.sleep(seconds)
-            return f"Waited {seconds} seconds (async)."
-        return asyncio.get_event_loop().run_until_complete(_wait())
-    else:
+    if mode not in ("blocking", "async"):
         raise ValueError("mode must be 'blocking' or 'async'")
+    if seconds < 0:  # asyncio.sleep would return at once; keep time.sleep's error
+        raise ValueError("sleep length must be non-negative")
+    await asyncio.sleep(seconds)
+    return f"Waited {seconds} seconds ({mode})."
 
 if __name__ == "__main__":
-    print(f"Starting MCP Server on {HOST}:{PORT}{PATH}")
+    uds = HOST.startswith("/")
+    print(f"Starting MCP Server on {'unix:' + HOST if uds else f'{HOST}:{PORT}{PATH}'}")
     print("Available tools:")
     print("  - File operations (read_file, write_file, list_dir, etc.)")
     print("  - Terminal commands (execute_shell_command)")
     print("  - Browser automation (browser_open_page, browser_screenshot, etc.)")
     print("  - System info (get_system_info, ping_host, etc.)")
     print("  - Math and time operations")
-    print(f"Access MCP endpoint at: http://{HOST}:{PORT}{PATH}")
     print("Transport: Server-Sent Events (SSE)")
-    mcp.run(transport="sse", host=HOST, port=PORT, path=PATH) 
\ No newline at end of file
+    if BROWSER_POOL_MIN > 0:
+        try:
+            _run(_pool.warm())
+        except Exception as e:  # browser tools still launch lazily on first use
+            print(f"Browser warm-up failed: {e}")
+    if uds:
+        # Co-located clients skip the TCP stack entirely; uvicorn binds the socket and ignores host/port
+        print(f"Access MCP endpoint at: http://localhost{PATH} via unix socket {HOST}")
+    else:
+        print(f"Access MCP endpoint at: http://{HOST}:{PORT}{PATH}")
+    mcp.run(
+        transport="sse", host=HOST, port=PORT, path=PATH, log_level=LOG_LEVEL.lower(),
+        uvicorn_config={"uds": HOST} if uds else None,
+    )
@@ -3,121 +3,232 @@
 Simple test script to verify the agent server setup.
 """
 
-import requests
+import asyncio
+import hashlib
+import httpx
 import json
+import socket
 import time
 import os
 
-# Configuration - single port setup
-BASE_URL = "http://localhost:8000"
+try:
+    import orjson
+except ImportError:  # plain json on the raw bytes still skips httpx's charset detection
+    orjson = None
+
+# Configuration - single port setup; environment is read once at import
+PORT = int(os.getenv("PORT", 8000))
+BASE_URL = f"http://localhost:{PORT}"
+# Same-host servers listening on a Unix socket are probed over it instead of loopback TCP
+AGENT_UDS_PATH = os.getenv("AGENT_UDS_PATH")
+ROOT_URL = f"{BASE_URL}/"
 MCP_URL = f"{BASE_URL}/mcp"
 AGENT_URL = f"{BASE_URL}/agent"
 MEMORY_URL = f"{BASE_URL}/memory"
+CHAT_BODY = {"message": "Hello! Can you tell me what tools you have available?"}
+LLM_PROVIDERS = ("OPENAI_API_KEY", "GOOGLE_API_KEY", "ANTHROPIC_API_KEY")
+PROVIDER_KEYS_SET = {provider: bool(os.getenv(provider)) for provider in LLM_PROVIDERS}
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "Not set")
+LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "Not set")
 
-def test_server():
-    """Test if unified server is running."""
-    try:
-        response = requests.get(f"{BASE_URL}/", timeout=5)
-        print(f"✅ Unified Server: {response.status_code}")
-        return True
-    except Exception as e:
-        print(f"❌ Unified Server: {e}")
-        return False
+# Readiness poll: per-attempt timeout, overall deadline, and backoff bounds (seconds)
+READY_TIMEOUT = 0.25
+READY_DEADLINE = 5
+READY_BACKOFF_MIN = 0.025
+READY_BACKOFF_MAX = 0.4
+# Bound on the whole probe run, readiness poll included (seconds); the chat POST alone may take 30
+TEST_DEADLINE = float(os.getenv("TEST_DEADLINE", 45))
+
+# Fast TCP keepalive probes so a half-open server is noticed within seconds rather than at
+# the read timeout; Linux names, skipped where the platform lacks them. anyio already sets
+# TCP_NODELAY on every connection.
+SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)] + [
+    (socket.IPPROTO_TCP, getattr(socket, name), value)
+    for name, value in (("TCP_KEEPIDLE", 1), ("TCP_KEEPINTVL", 1), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, name)
+]
 
-def test_mcp_endpoint():
-    """Test if MCP endpoint is accessible."""
+# Pass/fail and wall time in nanoseconds per probe label, filled in by timed()
+RESULTS = {}
+TIMINGS = {}
+
+async def timed(label, coro):
+    """Await coro, recording its result and wall time under label."""
+    start = time.perf_counter_ns()
     try:
-        response = requests.get(f"{MCP_URL}/", timeout=5)
-        print(f"✅ MCP Endpoint: {response.status_code}")
-        return True
-    except Exception as e:
-        print(f"❌ MCP Endpoint: {e}")
-        return False
+        RESULTS[label] = await coro
+        return RESULTS[label]
+    finally:
+        TIMINGS[label] = time.perf_counter_ns() - start
+
+def print_timings():
+    """Print recorded probe timings, slowest first."""
+    print("\n⏱  Timings:")
+    for label, elapsed_ns in sorted(TIMINGS.items(), key=lambda item: item[1], reverse=True):
+        print(f"   {label}: {elapsed_ns / 1e6:.1f} ms")
 
-def test_agent_endpoint():
-    """Test if agent endpoint is accessible."""
+# What a probe that reads a response body can fail with: transport errors, a broken
+# fixture file, undecodable JSON, or a payload without the expected shape
+BODY_ERRORS = (httpx.HTTPError, OSError, ValueError, KeyError, TypeError)
+
+def _json(response):
+    """Decode a response body as JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return json.loads(response.content)
+
+# Recorded chat responses: USE_FIXTURES=1 replays them, REFRESH_FIXTURES=1 re-records
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures")
+USE_FIXTURES = os.getenv("USE_FIXTURES") == "1"
+REFRESH_FIXTURES = os.getenv("REFRESH_FIXTURES") == "1"
+
+async def test_server(client):
+    """Test if unified server is running, polling with exponential backoff until it answers."""
+    deadline = time.monotonic() + READY_DEADLINE
+    delay = READY_BACKOFF_MIN
+    while True:
+        try:
+            response = await client.get(ROOT_URL, timeout=READY_TIMEOUT)
+            print(f"✅ Unified Server: {response.status_code}")
+            return True
+        except httpx.TransportError as e:
+            if time.monotonic() + delay >= deadline:
+                print(f"❌ Unified Server: {e}")
+                return False
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, READY_BACKOFF_MAX)
+
+# Reachability checks that only need a status line: (label, url, timeout)
+ENDPOINT_CHECKS = [
+    ("MCP Endpoint", f"{MCP_URL}/", 5),
+    ("Agent Endpoint", AGENT_URL, 5),
+]
+
+async def run_check(client, check):
+    """Test if an endpoint is accessible."""
+    label, url, timeout = check
     try:
-        response = requests.get(f"{AGENT_URL}", timeout=5)
-        print(f"✅ Agent Endpoint: {response.status_code}")
+        # Stream so only the status line is read; the MCP SSE body never ends
+        async with client.stream("GET", url, timeout=timeout) as response:
+            print(f"✅ {label}: {response.status_code}")
         return True
-    except Exception as e:
-        print(f"❌ Agent Endpoint: {e}")
+    except httpx.HTTPError as e:
+        print(f"❌ {label}: {e}")
         return False
 
-def test_chat():
+async def _cached_post(client, url, body, timeout):
+    """
+    POST body as JSON and return (status_code, parsed body or None).
+    With USE_FIXTURES=1 a recorded 200 response is replayed instead of hitting the server;
+    misses, and every call under REFRESH_FIXTURES=1, go to the network and record the result.
+    """
+    if not USE_FIXTURES:
+        response = await client.post(url, json=body, timeout=timeout)
+        return response.status_code, _json(response) if response.status_code == 200 else None
+    key = hashlib.sha1((url + json.dumps(body, sort_keys=True)).encode()).hexdigest()
+    path = os.path.join(FIXTURES_DIR, f"{key}.json")
+    if not REFRESH_FIXTURES and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return 200, json.load(f)
+    response = await client.post(url, json=body, timeout=timeout)
+    if response.status_code != 200:
+        return response.status_code, None
+    result = _json(response)
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    return 200, result
+
+async def test_chat(client):
     """Test chat functionality."""
     try:
-        data = {"message": "Hello! Can you tell me what tools you have available?"}
-        response = requests.post(f"{AGENT_URL}", json=data, timeout=30)
+        status_code, result = await _cached_post(client, AGENT_URL, CHAT_BODY, timeout=30)
         
-        if response.status_code == 200:
-            result = response.json()
+        if status_code == 200:
             print(f"✅ Chat Test: {result['success']}")
             print(f"   Response: {result['response'][:100]}...")
             return True
         else:
-            print(f"❌ Chat Test: HTTP {response.status_code}")
+            print(f"❌ Chat Test: HTTP {status_code}")
             return False
-    except Exception as e:
-        print(f"❌ Chat Test: {e}")
+    except BODY_ERRORS as e:
+        print(f"❌ Chat Test: {e!r}")
         return False
 
-def test_memory():
+async def test_memory(client):
     """Test memory functionality."""
     try:
         # Get memory
-        response = requests.get(f"{MEMORY_URL}", timeout=5)
+        response = await client.get(MEMORY_URL, timeout=5)
         if response.status_code == 200:
-            memory = response.json()
+            memory = _json(response)
             print(f"✅ Memory Test: {len(memory['memory'])} items")
             return True
         else:
             print(f"❌ Memory Test: HTTP {response.status_code}")
             return False
-    except Exception as e:
-        print(f"❌ Memory Test: {e}")
+    except BODY_ERRORS as e:
+        print(f"❌ Memory Test: {e!r}")
         return False
 
-def main():
+async def run_probes(client):
+    """Run the probes in order, recording each outcome in RESULTS as it finishes."""
+    # Test server
+    print("\n🌐 Server Tests:")
+    if not await timed("Unified Server", test_server(client)):
+        return
+    
+    # Independent probes run concurrently
+    print("\n🔗 Endpoint Tests:")
+    await asyncio.gather(
+        *(timed(check[0], run_check(client, check)) for check in ENDPOINT_CHECKS),
+        timed("Memory Function", test_memory(client)),
+    )
+    
+    # Test functionality
+    print("\n🤖 Functionality Tests:")
+    await timed("Chat Function", test_chat(client))
+
+async def main():
     """Run all tests."""
     print("🧪 Testing Unified Agent Server Setup")
     print("=" * 40)
     
     # Check environment variables
     print("\n📋 Environment Check:")
-    providers = ["OPENAI_API_KEY", "GOOGLE_API_KEY", "ANTHROPIC_API_KEY"]
-    for provider in providers:
-        if os.getenv(provider):
+    for provider, is_set in PROVIDER_KEYS_SET.items():
+        if is_set:
             print(f"✅ {provider}: Set")
         else:
             print(f"⚠️  {provider}: Not set")
     
     print(f"\n🔧 Configuration:")
-    print(f"   LLM Provider: {os.getenv('LLM_PROVIDER', 'Not set')}")
-    print(f"   Model: {os.getenv('LLM_MODEL_NAME', 'Not set')}")
+    print(f"   LLM Provider: {LLM_PROVIDER}")
+    print(f"   Model: {LLM_MODEL_NAME}")
     print(f"   Base URL: {BASE_URL}")
     
-    # Test server
-    print("\n🌐 Server Tests:")
-    server_ok = test_server()
+    # One client so every probe reuses the same keep-alive connection pool
+    if AGENT_UDS_PATH and os.path.exists(AGENT_UDS_PATH):
+        print(f"   Unix Socket: {AGENT_UDS_PATH}")
+        transport = httpx.AsyncHTTPTransport(uds=AGENT_UDS_PATH)  # TCP keepalive options don't apply
+    else:
+        transport = httpx.AsyncHTTPTransport(socket_options=SOCKET_OPTIONS)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30, transport=transport) as client:
+        try:
+            await asyncio.wait_for(run_probes(client), timeout=TEST_DEADLINE)
+        except asyncio.TimeoutError:
+            print(f"\n❌ Test deadline of {TEST_DEADLINE:g}s exceeded; unfinished probes count as failed.")
     
-    if not server_ok:
+    if not RESULTS.get("Unified Server"):
         print("\n❌ Server test failed. Make sure the server is running:")
         print("   python agent_endpoint.py")
         return
     
-    # Wait a moment for server to be ready
-    time.sleep(2)
-    
-    # Test endpoints
-    print("\n🔗 Endpoint Tests:")
-    mcp_ok = test_mcp_endpoint()
-    agent_ok = test_agent_endpoint()
-    
-    # Test functionality
-    print("\n🤖 Functionality Tests:")
-    chat_ok = test_chat()
-    memory_ok = test_memory()
+    server_ok = RESULTS["Unified Server"]
+    mcp_ok = RESULTS.get("MCP Endpoint", False)
+    agent_ok = RESULTS.get("Agent Endpoint", False)
+    chat_ok = RESULTS.get("Chat Function", False)
+    memory_ok = RESULTS.get("Memory Function", False)
     
     # Summary
     print("\n📊 Test Summary:")
@@ -127,6 +238,7 @@ def main():
     print(f"   Agent Endpoint: {'✅' if agent_ok else '❌'}")
     print(f"   Chat Function: {'✅' if chat_ok else '❌'}")
     print(f"   Memory Function: {'✅' if memory_ok else '❌'}")
+    print_timings()
     
     if all([server_ok, mcp_ok, agent_ok, chat_ok, memory_ok]):
         print("\n🎉 All tests passed! Your unified agent server is working correctly.")
@@ -139,4 +251,4 @@ def main():
         print("\n⚠️  Some tests failed. Check the logs above for details.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file